@@ -0,0 +1,74 @@
+"""Report seed time against recipe count.
+
+Usage (from the backend directory):
+
+    python benchmarks/bench_seed.py                      # in-memory planning only
+    python benchmarks/bench_seed.py --mongo-url mongodb://localhost:27017
+
+With --mongo-url every size is seeded into a scratch database that is
+dropped before and after the run.
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from seeding import BASE_ELEMENTS, element_key, plan_new_elements, plan_recipes, seed_database, seed_element_keys  # noqa: E402
+
+def synthetic_recipes(count):
+    """Build `count` distinct recipes over a growing set of made-up elements"""
+    keys = [element_key(name, emoji) for name, emoji in BASE_ELEMENTS]
+    recipes = []
+    i = j = 0
+    while len(recipes) < count:
+        result = f"🧪 Element {len(keys)}"
+        recipes.append({"element1": keys[i], "element2": keys[j], "result": result})
+        keys.append(result)
+        j += 1
+        if j > i:
+            i, j = i + 1, 0
+    return recipes
+
+def bench_plan(recipes):
+    started = time.perf_counter()
+    element_map = {}
+    plan_new_elements(seed_element_keys(recipes), element_map)
+    plan_recipes(recipes, element_map)
+    return time.perf_counter() - started
+
+async def bench_mongo(recipes, mongo_url, db_name):
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    client = AsyncIOMotorClient(mongo_url)
+    await client.drop_database(db_name)
+    db = client[db_name]
+    await db.combinations.create_index("pair_key", unique=True)
+    try:
+        started = time.perf_counter()
+        await seed_database(db, recipes)
+        return time.perf_counter() - started
+    finally:
+        await client.drop_database(db_name)
+        client.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="100,1000,10000,50000", help="comma-separated recipe counts")
+    parser.add_argument("--mongo-url", help="also time the bulk writes against this MongoDB")
+    parser.add_argument("--db-name", default="bench_seed")
+    args = parser.parse_args()
+
+    print(f"{'recipes':>10} {'plan (ms)':>12} {'seed (ms)':>12}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        recipes = synthetic_recipes(size)
+        plan_ms = bench_plan(recipes) * 1000
+        seed_ms = "-"
+        if args.mongo_url:
+            seed_ms = f"{asyncio.run(bench_mongo(recipes, args.mongo_url, args.db_name)) * 1000:.1f}"
+        print(f"{size:>10} {plan_ms:>12.1f} {seed_ms:>12}")
+
+if __name__ == "__main__":
+    main()
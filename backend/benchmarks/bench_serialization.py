@@ -0,0 +1,59 @@
+"""Compare response serialization before and after switching to orjson.
+
+Usage (from the backend directory):
+
+    python benchmarks/bench_serialization.py --elements 1000
+
+The old path serialized documents with json.dumps and a custom encoder,
+parsed them back with json.loads, and then had FastAPI encode the result
+again (jsonable_encoder + json.dumps). The new path hands the projected
+documents, which have no _id, straight to orjson.
+"""
+import argparse
+import json
+import timeit
+import uuid
+
+import orjson
+
+try:
+    from fastapi.encoders import jsonable_encoder
+except ImportError:
+    jsonable_encoder = None
+
+def synthetic_elements(count):
+    return [
+        {"id": str(uuid.uuid4()), "name": f"Element {i}", "emoji": "🧪"}
+        for i in range(count)
+    ]
+
+def old_path(elements):
+    content = json.loads(json.dumps(elements))
+    if jsonable_encoder:
+        content = jsonable_encoder(content)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+def new_path(elements):
+    return orjson.dumps(elements)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--elements", type=int, default=1000, help="documents per response")
+    parser.add_argument("--repeat", type=int, default=200, help="responses serialized per measurement")
+    args = parser.parse_args()
+
+    elements = synthetic_elements(args.elements)
+    assert json.loads(old_path(elements)) == json.loads(new_path(elements))
+
+    old = min(timeit.repeat(lambda: old_path(elements), number=args.repeat, repeat=5)) / args.repeat
+    new = min(timeit.repeat(lambda: new_path(elements), number=args.repeat, repeat=5)) / args.repeat
+
+    if jsonable_encoder is None:
+        print("fastapi is not installed, the old path omits jsonable_encoder")
+    print(f"{args.elements} elements per response")
+    print(f"  json round-trip: {old * 1e6:10.1f} us")
+    print(f"  orjson:          {new * 1e6:10.1f} us")
+    print(f"  speedup:         {old / new:10.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import sys
+from array import array
+
+from bson.binary import Binary
+
+# Discoveries are stored roaring-style: seqs are split into chunks of 2^16 by
+# their high bits, and each chunk is a container of the low 16 bits. A sparse
+# chunk is a sorted array of 2-byte values; once it would hold ARRAY_MAX seqs
+# the array is as large as a bitmap of the whole chunk (8 KiB), so it becomes
+# one. Both are stored as binary, so a chunk costs about what it holds.
+CHUNK_BITS = 16
+BITMAP_BYTES = (1 << CHUNK_BITS) // 8
+ARRAY_MAX = BITMAP_BYTES // 2
+
+# The discovery log keeps seqs in discovery order as 4-byte values, split
+# into segments so appending rewrites at most one segment
+LOG_SEGMENT = 1024
+
+
+def _pack(values, typecode):
+    packed = array(typecode, values)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return Binary(packed.tobytes())
+
+def _unpack(data, typecode):
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+def chunk_field(seq):
+    """Return the chunk key and the low bits of an element seq"""
+    return str(seq >> CHUNK_BITS), seq & ((1 << CHUNK_BITS) - 1)
+
+def container_values(container):
+    """Return the low bits held by a container, in ascending order"""
+    if container is None:
+        return []
+    if len(container) < BITMAP_BYTES:
+        return _unpack(container, "H").tolist()
+    values = []
+    for index, bits in enumerate(container):
+        while bits:
+            lowest = bits & -bits
+            values.append(index * 8 + lowest.bit_length() - 1)
+            bits ^= lowest
+    return values
+
+def _container(values):
+    """Build the smaller container for a sorted list of distinct low bits"""
+    if len(values) < ARRAY_MAX:
+        return _pack(values, "H")
+    data = bytearray(BITMAP_BYTES)
+    for value in values:
+        data[value >> 3] |= 1 << (value & 7)
+    return Binary(bytes(data))
+
+def container_contains(container, low):
+    if container is None:
+        return False
+    if len(container) < BITMAP_BYTES:
+        values = _unpack(container, "H")
+        # Binary search over the sorted array
+        lo, hi = 0, len(values)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if values[mid] < low:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo < len(values) and values[lo] == low
+    return bool(container[low >> 3] & (1 << (low & 7)))
+
+def container_add(container, low):
+    """Return the container with low added, switching to a bitmap when the array fills up"""
+    if container is not None and len(container) >= BITMAP_BYTES:
+        data = bytearray(container)
+        data[low >> 3] |= 1 << (low & 7)
+        return Binary(bytes(data))
+    values = container_values(container)
+    if low not in values:
+        values.append(low)
+        values.sort()
+    return _container(values)
+
+def encode(seqs):
+    """Pack element seqs into a {chunk key: container} map; empty chunks are left out"""
+    chunks = {}
+    for seq in seqs:
+        key, low = chunk_field(seq)
+        chunks.setdefault(key, set()).add(low)
+    return {key: _container(sorted(values)) for key, values in chunks.items()}
+
+def decode(chunks):
+    """Return the element seqs in a chunk map, in ascending order"""
+    seqs = []
+    for key in sorted(chunks, key=int):
+        base = int(key) << CHUNK_BITS
+        seqs.extend(base + low for low in container_values(chunks[key]))
+    return seqs
+
+def contains(chunks, seq):
+    key, low = chunk_field(seq)
+    return container_contains(chunks.get(key), low)
+
+def encode_log(seqs):
+    """Pack seqs, in discovery order, into log segments"""
+    seqs = list(seqs)
+    return [_pack(seqs[start:start + LOG_SEGMENT], "I") for start in range(0, len(seqs), LOG_SEGMENT)]
+
+def decode_log(segments):
+    """Return the seqs of a discovery log, in discovery order"""
+    seqs = []
+    for segment in segments:
+        seqs.extend(_unpack(segment, "I"))
+    return seqs
+
+def log_append(last_segment, length, seq):
+    """Return (segment index, segment) that appends seq to a log holding length seqs.
+
+    last_segment is the log's final segment, or None if it has none.
+    """
+    index, offset = divmod(length, LOG_SEGMENT)
+    values = _unpack(last_segment, "I").tolist() if offset else []
+    values.append(seq)
+    return index, _pack(values, "I")
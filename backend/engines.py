@@ -0,0 +1,335 @@
+import asyncio
+from abc import ABC, abstractmethod
+import hashlib
+import json
+import logging
+import re
+import unicodedata
+
+from llm_cache import normalize_prompt
+from metrics import LLM_REQUESTS, record_llm_usage
+from rate_limit import LLMOverloaded
+
+logger = logging.getLogger(__name__)
+
+SYSTEM_PROMPT = """Word Combination Assistant Prompt
+You are a specialized AI assistant that creates new word combinations and matching emojis when two existing elements are combined. Your task is to generate creative, logical, and engaging results when users combine different words.
+Core Functionality
+When presented with two input elements, you will:
+Analyze both input elements (words and their emojis)
+Determine a logical or creative combination result
+Select an appropriate emoji that matches the result
+Return only the result and emoji in the specified format
+Input Format
+You will receive input in the form: "{word1} {emoji1} + {word2} {emoji2}"
+Output Format
+You must respond with ONLY the resulting word and emoji in the format: "{result} {emoji}"
+Do not include any explanations, greetings, or additional text
+Do not reference the input elements in your response
+Do not include quotation marks in your output
+Combination Rules
+When creating combinations:
+Aim for results that follow intuitive logic when possible
+Be creative but maintain plausibility in your combinations
+Consider both scientific and cultural associations
+Select the most appropriate and visually clear emoji for each result
+Maintain consistent results for the same input combinations
+Create combinations that can lead to further interesting combinations"""
+
+BATCH_PROMPT = """Batch Mode
+You will receive several inputs, one per line, each prefixed with its number.
+Combine each input independently, following the rules above.
+Respond with a JSON object whose "results" array holds one "{result} {emoji}" string per input, in the same order as the inputs."""
+
+BATCH_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "combination_results",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {"results": {"type": "array", "items": {"type": "string"}}},
+            "required": ["results"],
+            "additionalProperties": False
+        }
+    }
+}
+
+
+# Characters that extend the emoji before them: zero width joiner, variation
+# selectors, the keycap mark, skin tone modifiers and tag characters
+EMOJI_CONTINUATION = re.compile("[\u200d\ufe0e\ufe0f\u20e3\U0001F3FB-\U0001F3FF\U000E0020-\U000E007F]")
+
+
+def ends_with_emoji(text):
+    """True once text reads "{name} {emoji}" and the emoji isn't waiting for a joined part"""
+    parts = text.split()
+    if len(parts) < 2 or text[-1] == "\u200d":
+        return False
+    return any(unicodedata.category(char) == "So" or ord(char) >= 0x1F000 for char in parts[-1])
+
+
+class CombinationEngine(ABC):
+    """Turns an input like "💧 Water + 🔥 Fire" into a "{result} {emoji}" text.
+
+    Engines whose answers are worth keeping set `cacheable`, and `model`
+    and `system_prompt` then form part of the LLM cache key. Engines that
+    gain from micro-batching set `supports_batching`.
+    """
+
+    name = "base"
+    model = ""
+    system_prompt = ""
+    cacheable = False
+    supports_batching = False
+
+    @abstractmethod
+    async def complete(self, input_text, limiter=None):
+        """Return the "{result} {emoji}" text for one input"""
+
+    async def complete_batch(self, input_texts):
+        """Return one result text (or exception) per input, in order"""
+        return await asyncio.gather(*(self.complete(text) for text in input_texts), return_exceptions=True)
+
+
+class OpenAIEngine(CombinationEngine):
+    """Chat completions over HTTP against the OpenAI API or any compatible server"""
+
+    name = "openai"
+    cacheable = True
+    supports_batching = True
+    # How long a stream stays open after its answer, waiting for the usage report
+    usage_wait_seconds = 2.0
+
+    def __init__(self, client, limiter, api_url, api_key, model="gpt-4o", stream=True):
+        self.client = client
+        self.limiter = limiter
+        self.api_url = api_url
+        self.api_key = api_key
+        self.model = model
+        self.stream = stream
+        self.system_prompt = SYSTEM_PROMPT
+        # Streams still being read for their usage report after answering
+        self.streams = set()
+
+    def headers(self):
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        return headers
+
+    def check_status(self, response):
+        """Turn provider throttling or outages into LLMOverloaded instead of guessing a result"""
+        if response.status_code == 429 or response.status_code >= 500:
+            retry_after = float(response.headers.get("retry-after", "1") or 1)
+            raise LLMOverloaded(f"LLM provider returned {response.status_code}", retry_after=retry_after)
+
+    async def post(self, payload, limiter=None):
+        """Send a chat completion through the limiter and return the parsed response"""
+        async with (limiter or self.limiter).slot():
+            LLM_REQUESTS.labels(self.name, "batch" if "response_format" in payload else "single").inc()
+            response = await self.client.post(self.api_url, json=payload, headers=self.headers())
+
+        self.check_status(response)
+        response_data = response.json()
+        record_llm_usage(self.name, response_data.get("usage"))
+        return response_data
+
+    async def post_streaming(self, payload, limiter=None):
+        """Stream a chat completion and return the answer as soon as it is complete.
+
+        The answer is a single "{result} {emoji}" line. Once the text ends in
+        an emoji after a name, the next chunk decides: unless it continues
+        the emoji (a joiner, variation selector or modifier), the answer is
+        done and returned. A newline ends the answer too.
+
+        The stream asks for a usage report, which providers send as the last
+        chunk, so the rest of the stream is read in the background to record
+        the real token counts. It is closed instead, which stops generation,
+        if the model writes past the answer or the report takes longer than
+        `usage_wait_seconds`.
+        """
+        answer = asyncio.get_running_loop().create_future()
+        task = asyncio.create_task(self.read_stream(payload, limiter, answer))
+        self.streams.add(task)
+        task.add_done_callback(self.streams.discard)
+        try:
+            text = await answer
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+        asyncio.get_running_loop().call_later(self.usage_wait_seconds, task.cancel)
+
+        result_text = text.strip().split("\n")[0].strip()
+        if not result_text:
+            raise ValueError("LLM stream ended without a result")
+        return result_text
+
+    async def read_stream(self, payload, limiter, answer):
+        """Read a completion stream, resolving `answer` with the text once it is complete.
+
+        The limiter slot is held only until then; waiting for the usage
+        report doesn't count against the concurrency limit.
+        """
+        text = ""
+        complete = False
+        limiter = limiter or self.limiter
+        payload = {**payload, "stream": True, "stream_options": {"include_usage": True}}
+
+        held = False
+
+        def resolve(result):
+            nonlocal held
+            answer.set_result(result)
+            limiter.release()
+            held = False
+
+        try:
+            await limiter.acquire()
+            held = True
+            LLM_REQUESTS.labels(self.name, "stream").inc()
+            async with self.client.stream("POST", self.api_url, json=payload, headers=self.headers()) as response:
+                self.check_status(response)
+                if response.status_code != 200:
+                    logger.error(f"Response data: {(await response.aread()).decode(errors='replace')}")
+                    raise ValueError(f"LLM provider returned {response.status_code}")
+
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+
+                    chunk = json.loads(data)
+                    if chunk.get("usage"):
+                        record_llm_usage(self.name, chunk["usage"])
+                        break
+                    choices = chunk.get("choices") or []
+                    delta = (choices[0].get("delta", {}).get("content") or "") if choices else ""
+
+                    if not answer.done():
+                        if complete and not EMOJI_CONTINUATION.match(delta):
+                            resolve(text)
+                        else:
+                            text += delta
+                            complete = ends_with_emoji(text)
+                            if "\n" in text.lstrip():
+                                resolve(text)
+                            continue
+
+                    # Leaving the block closes the connection and stops generation
+                    if delta:
+                        break
+
+            if not answer.done():
+                resolve(text)
+        except Exception as e:
+            if not answer.done():
+                answer.set_exception(e)
+            else:
+                logger.warning(f"Could not read the LLM usage report: {str(e)}")
+        finally:
+            if held:
+                limiter.release()
+
+    async def complete(self, input_text, limiter=None):
+        """Complete one input; `limiter` replaces the engine's limiter for this call"""
+        payload = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": self.system_prompt},
+                {"role": "user", "content": input_text}
+            ]
+        }
+
+        if self.stream:
+            return await self.post_streaming(payload, limiter)
+
+        response_data = await self.post(payload, limiter)
+        try:
+            return response_data['choices'][0]['message']['content'].strip()
+        except (KeyError, IndexError, TypeError):
+            logger.error(f"Response data: {response_data}")
+            raise
+
+    async def complete_batch(self, input_texts):
+        """Combine several pairs with one structured-output call.
+
+        Falls back to one call per pair if the batched answer can't be used.
+        """
+        if len(input_texts) == 1:
+            return [await self.complete(input_texts[0])]
+
+        payload = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": f"{self.system_prompt}\n{BATCH_PROMPT}"},
+                {"role": "user", "content": "\n".join(f"{i}. {text}" for i, text in enumerate(input_texts, 1))}
+            ],
+            "response_format": BATCH_RESPONSE_FORMAT
+        }
+
+        try:
+            response_data = await self.post(payload)
+            content = response_data['choices'][0]['message']['content']
+            results = [result.strip() for result in json.loads(content)["results"]]
+            if len(results) == len(input_texts) and all(results):
+                logger.info(f"Generated {len(results)} combinations in one batched LLM call")
+                return results
+            logger.warning(f"Batched LLM call returned {len(results)} results for {len(input_texts)} pairs")
+        except LLMOverloaded:
+            # Splitting the batch would only add load
+            raise
+        except Exception as e:
+            logger.warning(f"Batched LLM call failed: {str(e)}")
+
+        return await super().complete_batch(input_texts)
+
+
+class OpenAICompatibleEngine(OpenAIEngine):
+    """Chat completions from a local OpenAI-compatible server (llama.cpp, vLLM, Ollama...)"""
+
+    name = "local"
+
+
+class DeterministicEngine(CombinationEngine):
+    """Fast in-process generator that needs no network.
+
+    The result for a pair is chosen by hashing the normalized, order-
+    independent input into a vocabulary of known results, normally every
+    result of the existing recipes. The same pair always gives the same
+    answer, which makes it suitable for load tests and for keeping the
+    game playable when the provider is down.
+    """
+
+    name = "deterministic"
+    model = "deterministic"
+    fallback_vocabulary = [("Mystery", "🔮"), ("Spark", "✨"), ("Dust", "🌫️"), ("Crystal", "💎")]
+
+    def __init__(self):
+        self.vocabulary = list(self.fallback_vocabulary)
+
+    def seed(self, elements):
+        """Use the given (name, emoji) results as the vocabulary"""
+        vocabulary = sorted(set(elements))
+        self.vocabulary = vocabulary or list(self.fallback_vocabulary)
+
+    async def complete(self, input_text, limiter=None):
+        parts = sorted(normalize_prompt(part) for part in input_text.split(" + "))
+        digest = hashlib.sha256(" + ".join(parts).encode("utf-8")).digest()
+        name, emoji = self.vocabulary[int.from_bytes(digest[:8], "big") % len(self.vocabulary)]
+        return f"{name} {emoji}"
+
+
+def create_combination_engine(backend, client=None, limiter=None, api_url=None, api_key=None, model="gpt-4o", stream=True):
+    """Build the combination engine named by configuration"""
+    if backend == "openai":
+        if not api_key:
+            raise ValueError("The openai combination engine needs OPENAI_API_KEY; set it or choose another COMBINATION_ENGINE")
+        return OpenAIEngine(client, limiter, api_url, api_key, model=model, stream=stream)
+    if backend == "local":
+        return OpenAICompatibleEngine(client, limiter, api_url, api_key, model=model, stream=stream)
+    if backend == "deterministic":
+        return DeterministicEngine()
+    raise ValueError(f"Unknown combination engine: {backend}")
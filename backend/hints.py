@@ -0,0 +1,57 @@
+import numpy as np
+
+
+class RecipeTable:
+    """Recipes as parallel integer arrays over element seqs.
+
+    Recipe i is (first[i], second[i], result[i]). A player's discoveries
+    become a boolean mask indexed by seq, so checking every recipe against
+    them is a handful of vectorized array operations.
+    """
+
+    def __init__(self, capacity=1024):
+        self.element_count = 0
+        self.first = np.empty(capacity, dtype=np.int32)
+        self.second = np.empty(capacity, dtype=np.int32)
+        self.result = np.empty(capacity, dtype=np.int32)
+        self.size = 0
+
+    def clear(self):
+        self.element_count = 0
+        self.size = 0
+
+    def add_recipe(self, element1_seq, element2_seq, result_seq):
+        if self.size == len(self.first):
+            # Grow by doubling so appends stay amortized O(1)
+            capacity = 2 * len(self.first)
+            for name in ("first", "second", "result"):
+                grown = np.empty(capacity, dtype=np.int32)
+                grown[:self.size] = getattr(self, name)[:self.size]
+                setattr(self, name, grown)
+
+        self.first[self.size] = element1_seq
+        self.second[self.size] = element2_seq
+        self.result[self.size] = result_seq
+        self.size += 1
+        self.element_count = max(self.element_count, element1_seq + 1, element2_seq + 1, result_seq + 1)
+
+    def discovery_mask(self, element_seqs):
+        """Return a boolean array with True at every given seq"""
+        mask = np.zeros(self.element_count, dtype=bool)
+        seqs = np.fromiter(element_seqs, dtype=np.int64)
+        # Elements newer than every recipe can't take part in one
+        mask[seqs[seqs < self.element_count]] = True
+        return mask
+
+    def next_discoveries(self, discovered_seqs):
+        """Return the (first, second, result) seqs of recipes a player can make for something new.
+
+        A recipe qualifies when both inputs are discovered and the result
+        is not. Only the first such recipe for each result is returned.
+        """
+        discovered = self.discovery_mask(discovered_seqs)
+        first, second, result = self.first[:self.size], self.second[:self.size], self.result[:self.size]
+        matches = np.flatnonzero(discovered[first] & discovered[second] & ~discovered[result])
+        _, first_per_result = np.unique(result[matches], return_index=True)
+        matches = matches[np.sort(first_per_result)]
+        return list(zip(first[matches].tolist(), second[matches].tolist(), result[matches].tolist()))
@@ -0,0 +1,52 @@
+"""Import a recipe dump into MongoDB without starting the web server.
+
+Usage (from the backend directory):
+
+    python import_recipes.py /path/to/recipes.jsonl
+    python import_recipes.py /path/to/combinations.json --batch-size 5000
+
+Files ending in .jsonl or .ndjson hold one {"element1", "element2",
+"result"} object per line; anything else is read as a JSON array in the
+same shape as data/combinations.json. Existing elements and recipes are
+never overwritten, so an import can be re-run safely.
+"""
+import argparse
+import asyncio
+import logging
+import os
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from seeding import import_recipes
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+async def run(path, batch_size, file_format):
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db = client[os.environ.get('DB_NAME', 'test_database')]
+    try:
+        new_elements, recipes = await import_recipes(db, path, batch_size=batch_size, file_format=file_format)
+        logger.info(f"Import finished: {recipes} recipes read, {new_elements} new elements")
+    finally:
+        client.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", type=Path, help="recipe file to import")
+    parser.add_argument("--batch-size", type=int, default=1000, help="recipes parsed and written per batch")
+    parser.add_argument("--format", dest="file_format", choices=["auto", "json", "jsonl"], default="auto")
+    args = parser.parse_args()
+
+    asyncio.run(run(args.path, args.batch_size, args.file_format))
+
+if __name__ == "__main__":
+    main()
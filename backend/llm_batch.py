@@ -0,0 +1,57 @@
+import asyncio
+
+
+class MicroBatcher:
+    """Collect submitted items for a short window and process them together.
+
+    process_batch receives a list of items and must return a list of the
+    same length. An entry that is an exception is raised to the caller
+    that submitted that item; an exception raised by process_batch itself
+    is raised to every caller in the batch.
+    """
+
+    def __init__(self, process_batch, window_seconds=0.005, max_batch_size=16):
+        self.process_batch = process_batch
+        self.window_seconds = window_seconds
+        self.max_batch_size = max_batch_size
+        self.pending = []
+        self.timer = None
+        self.running = set()
+
+    async def submit(self, item):
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append((item, future))
+
+        if len(self.pending) >= self.max_batch_size:
+            self._flush()
+        elif self.timer is None:
+            self.timer = asyncio.get_running_loop().call_later(self.window_seconds, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+        batch, self.pending = self.pending, []
+        if batch:
+            # Keep a reference so the task isn't garbage collected mid-flight
+            task = asyncio.ensure_future(self._run(batch))
+            self.running.add(task)
+            task.add_done_callback(self.running.discard)
+
+    async def _run(self, batch):
+        items = [item for item, _ in batch]
+        try:
+            results = await self.process_batch(items)
+        except Exception as e:
+            results = [e] * len(batch)
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
@@ -0,0 +1,107 @@
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import unicodedata
+
+
+def normalize_prompt(text):
+    """Normalize prompt text so trivially different inputs share a cache entry"""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+def cache_key(model, system_prompt, input_text):
+    """Content address of a completion: hash of model, system prompt and normalized input"""
+    material = json.dumps([model, normalize_prompt(system_prompt), normalize_prompt(input_text)], ensure_ascii=False)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class NullLLMCache:
+    """Cache backend that stores nothing"""
+
+    async def get(self, key):
+        return None
+
+    async def set(self, key, value):
+        pass
+
+    def close(self):
+        pass
+
+
+class SQLiteLLMCache:
+    """LLM responses in a local SQLite file, evicted least-recently-used by size.
+
+    SQLite calls are blocking, so they run in a worker thread behind a lock.
+    """
+
+    def __init__(self, path, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(path), check_same_thread=False)
+        with self.lock:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " last_used REAL NOT NULL)"
+            )
+            self.conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_last_used ON llm_cache (last_used)")
+            self.conn.commit()
+
+    async def get(self, key):
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key, value):
+        await asyncio.to_thread(self._set, key, value)
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    def _get(self, key):
+        with self.lock:
+            row = self.conn.execute("SELECT value FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self.conn.execute("UPDATE llm_cache SET last_used = ? WHERE key = ?", (time.time(), key))
+            self.conn.commit()
+            return row[0]
+
+    def _set(self, key, value):
+        size = len(key) + len(value.encode("utf-8"))
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, size, last_used) VALUES (?, ?, ?, ?)",
+                (key, value, size, time.time())
+            )
+            self._evict()
+            self.conn.commit()
+
+    def _evict(self):
+        """Drop least recently used entries until the cache is back under max_bytes"""
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        # Evict down to 90% so a full cache doesn't evict on every insert
+        excess = total - int(self.max_bytes * 0.9)
+        evicted = []
+        for key, size in self.conn.execute("SELECT key, size FROM llm_cache ORDER BY last_used"):
+            evicted.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        self.conn.executemany("DELETE FROM llm_cache WHERE key = ?", evicted)
+
+
+def create_llm_cache(backend, path, max_bytes):
+    """Build the LLM cache backend named by configuration"""
+    if backend == "sqlite":
+        return SQLiteLLMCache(path, max_bytes=max_bytes)
+    if backend == "none":
+        return NullLLMCache()
+    raise ValueError(f"Unknown LLM cache backend: {backend}")
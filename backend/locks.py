@@ -0,0 +1,94 @@
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+
+class LocalGenerationLock:
+    """Lock backend for a single worker.
+
+    Concurrent requests inside one process are already coalesced by the
+    single-flight layer, so there is nothing left to lock here.
+    """
+
+    async def setup(self):
+        pass
+
+    async def acquire(self, key):
+        return "local"
+
+    async def release(self, key, token):
+        pass
+
+
+class MongoGenerationLock:
+    """Lease-based lock shared by every worker through a MongoDB collection.
+
+    A lock is a document whose _id is the lock key and whose owner is a
+    token only the holder knows, so a worker can only renew or release
+    its own lease. While held, the lease is renewed in the background;
+    a lease that is never released (e.g. the worker crashed) can be taken
+    over once it expires, and a TTL index cleans up whatever is left behind.
+    """
+
+    def __init__(self, collection, lease_seconds=30):
+        self.collection = collection
+        self.lease = timedelta(seconds=lease_seconds)
+        self.renewals = {}
+
+    async def setup(self):
+        await self.collection.create_index("expires_at", expireAfterSeconds=0)
+
+    async def acquire(self, key):
+        """Try to take the lock once; return an owner token, or None if another worker holds it"""
+        token = uuid.uuid4().hex
+        now = datetime.now(timezone.utc)
+        try:
+            await self.collection.insert_one({"_id": key, "owner": token, "expires_at": now + self.lease})
+        except DuplicateKeyError:
+            # Take over the lease if its holder let it expire
+            taken = await self.collection.find_one_and_update(
+                {"_id": key, "expires_at": {"$lt": now}},
+                {"$set": {"owner": token, "expires_at": now + self.lease}}
+            )
+            if taken is None:
+                return None
+
+        self.renewals[(key, token)] = asyncio.ensure_future(self._renew(key, token))
+        return token
+
+    async def release(self, key, token):
+        renewal = self.renewals.pop((key, token), None)
+        if renewal:
+            renewal.cancel()
+        await self.collection.delete_one({"_id": key, "owner": token})
+
+    async def _renew(self, key, token):
+        """Extend the lease every third of its length for as long as it is held"""
+        while True:
+            await asyncio.sleep(self.lease.total_seconds() / 3)
+            try:
+                renewed = await self.collection.update_one(
+                    {"_id": key, "owner": token},
+                    {"$set": {"expires_at": datetime.now(timezone.utc) + self.lease}}
+                )
+            except Exception as e:
+                # Try again next round; the lease still has two thirds to run
+                logger.warning(f"Error renewing generation lock {key}: {str(e)}")
+                continue
+            if not renewed.matched_count:
+                logger.warning(f"Lost generation lock {key}")
+                return
+
+
+def create_generation_lock(backend, db, lease_seconds=30):
+    """Build the generation lock backend named by configuration"""
+    if backend == "mongo":
+        return MongoGenerationLock(db.generation_locks, lease_seconds=lease_seconds)
+    if backend == "local":
+        return LocalGenerationLock()
+    raise ValueError(f"Unknown generation lock backend: {backend}")
@@ -0,0 +1,119 @@
+import os
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+# With several worker processes each one only counts its own requests. Set
+# PROMETHEUS_MULTIPROC_DIR to an empty directory shared by the workers (and
+# cleared before they start) so every worker writes its metrics there and
+# /metrics aggregates all of them. Without it, run a single worker.
+#
+# prometheus_client picks per-process or shared storage when it is first
+# imported, so backend/.env is loaded here, before that import, and this
+# module has to be imported before anything else that imports prometheus_client.
+load_dotenv(Path(__file__).parent / '.env')
+MULTIPROC_DIR = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+
+from prometheus_client import (  # noqa: E402
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess
+)
+from pymongo import monitoring  # noqa: E402
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route",
+    ["method", "route", "status"]
+)
+
+COMBINE_STAGE_SECONDS = Histogram(
+    "combine_stage_duration_seconds",
+    "Time spent in each stage of a combine request",
+    ["stage"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+
+RECIPE_LOOKUPS = Counter(
+    "recipe_cache_lookups_total",
+    "Recipe lookups answered by the in-memory recipe index (hit) or not (miss)",
+    ["result"]
+)
+
+LLM_CACHE_LOOKUPS = Counter(
+    "llm_cache_lookups_total",
+    "LLM completion cache lookups",
+    ["result"]
+)
+
+LLM_REQUESTS = Counter(
+    "llm_requests_total",
+    "Chat completion calls made to the LLM provider",
+    ["engine", "kind"]
+)
+
+LLM_TOKENS = Counter(
+    "llm_tokens_total",
+    "LLM tokens used, as reported by the provider",
+    ["engine", "kind"]
+)
+
+LLM_ERRORS = Counter(
+    "llm_errors_total",
+    "Combinations whose generation failed, by reason",
+    ["reason"]
+)
+
+MONGO_COMMANDS = Counter(
+    "mongo_commands_total",
+    "MongoDB commands sent, by command name and outcome",
+    ["command", "outcome"]
+)
+
+MONGO_COMMAND_SECONDS = Histogram(
+    "mongo_command_duration_seconds",
+    "MongoDB command latency by command name",
+    ["command"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+)
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Count and time every command the Mongo client sends"""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        MONGO_COMMANDS.labels(event.command_name, "success").inc()
+        MONGO_COMMAND_SECONDS.labels(event.command_name).observe(event.duration_micros / 1e6)
+
+    def failed(self, event):
+        MONGO_COMMANDS.labels(event.command_name, "failure").inc()
+        MONGO_COMMAND_SECONDS.labels(event.command_name).observe(event.duration_micros / 1e6)
+
+
+def record_llm_usage(engine, usage):
+    """Count the tokens of an OpenAI-style usage object, if the response had one"""
+    if not usage:
+        return
+    LLM_TOKENS.labels(engine, "prompt").inc(usage.get("prompt_tokens") or 0)
+    LLM_TOKENS.labels(engine, "completion").inc(usage.get("completion_tokens") or 0)
+
+
+def metrics_registry():
+    """Return the registry to expose: every worker's metrics in multiprocess mode, else this process's"""
+    if not MULTIPROC_DIR:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry, path=MULTIPROC_DIR)
+    return registry
+
+
+def render_metrics():
+    """Return the /metrics body and its content type"""
+    return generate_latest(metrics_registry()), CONTENT_TYPE_LATEST
@@ -0,0 +1,102 @@
+import asyncio
+import contextvars
+import heapq
+import itertools
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# True inside pre-generation workers, so speculative results don't schedule
+# further speculation of their own
+speculative_generation = contextvars.ContextVar("speculative_generation", default=False)
+
+
+class TopCounter:
+    """Approximate most-used counter holding at most 2 * capacity keys.
+
+    When it grows past that, only the capacity most counted keys are kept,
+    so memory stays bounded and most_common scans a small dict no matter
+    how many distinct keys were ever counted.
+    """
+
+    def __init__(self, capacity=1000):
+        self.capacity = capacity
+        self.counts = {}
+
+    def update(self, keys):
+        for key in keys:
+            self.counts[key] = self.counts.get(key, 0) + 1
+        if len(self.counts) > 2 * self.capacity:
+            self.counts = dict(heapq.nlargest(self.capacity, self.counts.items(), key=lambda item: item[1]))
+
+    def most_common(self, n):
+        return heapq.nlargest(n, self.counts.items(), key=lambda item: item[1])
+
+
+class Pregenerator:
+    """Background queue that generates likely next recipes off the request path.
+
+    Pairs are scheduled with a priority (lower runs first) and generated by
+    a few worker tasks. At most budget_per_hour generations run per hour;
+    pairs that come up once the budget is spent, or that don't fit in the
+    queue, are dropped rather than delayed.
+    """
+
+    def __init__(self, generate, has_recipe, budget_per_hour=100, workers=2, max_queue=1000):
+        self.generate = generate
+        self.has_recipe = has_recipe
+        self.budget_per_hour = budget_per_hour
+        self.workers = workers
+        self.queue = asyncio.PriorityQueue(maxsize=max_queue)
+        self.order = itertools.count()
+        self.queued = set()
+        self.tasks = []
+        self.window_start = time.monotonic()
+        self.spent = 0
+
+    def schedule(self, key, element1, element2, priority):
+        if key in self.queued or self.has_recipe(element1, element2):
+            return
+        try:
+            self.queue.put_nowait((priority, next(self.order), key, element1, element2))
+            self.queued.add(key)
+        except asyncio.QueueFull:
+            logger.debug(f"Pre-generation queue full, dropping {element1['name']} + {element2['name']}")
+
+    def start(self):
+        self.tasks = [asyncio.ensure_future(self._work()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+
+    def _take_budget(self):
+        now = time.monotonic()
+        if now - self.window_start >= 3600:
+            self.window_start, self.spent = now, 0
+        if self.spent >= self.budget_per_hour:
+            return False
+        self.spent += 1
+        return True
+
+    async def _work(self):
+        speculative_generation.set(True)
+        while True:
+            _, _, key, element1, element2 = await self.queue.get()
+            self.queued.discard(key)
+            try:
+                # A player may have combined the pair while it was queued
+                if self.has_recipe(element1, element2):
+                    continue
+                if not self._take_budget():
+                    logger.debug(f"Pre-generation budget spent, dropping {element1['name']} + {element2['name']}")
+                    continue
+                await self.generate(element1, element2)
+                logger.info(f"Pre-generated {element1['name']} + {element2['name']}")
+            except Exception as e:
+                logger.error(f"Error pre-generating combination: {str(e)}")
+            finally:
+                self.queue.task_done()
@@ -0,0 +1,128 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+
+class LLMUnavailable(Exception):
+    """Raised when a new combination can't be generated right now; the caller should retry later"""
+
+    player_message = "Couldn't create a new combination right now, please try again"
+
+    def __init__(self, message, retry_after=1.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class LLMOverloaded(LLMUnavailable):
+    """Raised when an LLM call can't be made in time"""
+
+    player_message = "Too many new combinations right now, please try again"
+
+
+class TokenBucket:
+    """Token bucket refilled at `rate` tokens per second, holding at most `burst`"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def reserve(self):
+        """Take a token and return how long to wait before using it.
+
+        The bucket may go negative, so later callers queue up behind
+        earlier reservations instead of racing them.
+        """
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def refund(self):
+        self.tokens = min(self.burst, self.tokens + 1)
+
+
+class LLMLimiter:
+    """Bound concurrent LLM calls and their rate, shedding load instead of piling up.
+
+    Callers wait for a concurrency slot and then for a rate token, but
+    never longer than max_wait_seconds in total. When the wait would be
+    longer, or max_queue callers are already waiting, LLMOverloaded is
+    raised straight away.
+    """
+
+    def __init__(self, max_concurrency=16, rate_per_second=8.0, burst=16, max_queue=100, max_wait_seconds=2.0):
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.bucket = TokenBucket(rate_per_second, burst)
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_wait_seconds = max_wait_seconds
+        self.waiting = 0
+        self.in_flight = 0
+        self.admitted = 0
+        self.shed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    async def acquire(self):
+        """Wait for a concurrency slot and a rate token; pair with release()"""
+        if self.waiting >= self.max_queue:
+            self.shed += 1
+            raise LLMOverloaded("Too many LLM requests queued", retry_after=self.max_wait_seconds)
+
+        started = time.monotonic()
+        deadline = started + self.max_wait_seconds
+        self.waiting += 1
+        try:
+            try:
+                await asyncio.wait_for(self.semaphore.acquire(), timeout=self.max_wait_seconds)
+            except asyncio.TimeoutError:
+                self.shed += 1
+                raise LLMOverloaded("Timed out waiting for an LLM slot", retry_after=self.max_wait_seconds)
+
+            delay = self.bucket.reserve()
+            if time.monotonic() + delay > deadline:
+                self.bucket.refund()
+                self.semaphore.release()
+                self.shed += 1
+                raise LLMOverloaded("LLM rate limit reached", retry_after=max(delay, 1.0))
+            if delay:
+                try:
+                    await asyncio.sleep(delay)
+                except BaseException:
+                    self.semaphore.release()
+                    raise
+        finally:
+            self.waiting -= 1
+
+        waited = time.monotonic() - started
+        self.admitted += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+        self.in_flight += 1
+
+    def release(self):
+        self.in_flight -= 1
+        self.semaphore.release()
+
+    @asynccontextmanager
+    async def slot(self):
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self):
+        return {
+            "in_flight": self.in_flight,
+            "max_concurrency": self.max_concurrency,
+            "queue_depth": self.waiting,
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "shed": self.shed,
+            "avg_wait_ms": round(self.total_wait / self.admitted * 1000, 2) if self.admitted else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 2)
+        }
@@ -0,0 +1,117 @@
+import heapq
+from collections import defaultdict
+
+
+class RecipeGraph:
+    """Recipes as a graph from element pairs to results, with cost-to-reach.
+
+    The cost of an element is the number of combines in the cheapest
+    crafting tree that makes it from the base elements: 0 for a base
+    element, and 1 + cost(first) + cost(second) through its best recipe.
+    Costs are found with Knuth's generalization of Dijkstra's algorithm
+    and kept current as recipes are added, so answering "how do I make X"
+    from the base elements is a walk down the stored best recipes. From a
+    player's discoveries it is a search that stops once X is settled.
+    """
+
+    def __init__(self):
+        self.uses = defaultdict(list)
+        self.base_ids = set()
+        self.cost = {}
+        self.best_recipe = {}
+
+    def clear(self):
+        self.uses.clear()
+        self.base_ids = set()
+        self.cost.clear()
+        self.best_recipe.clear()
+
+    def add_recipe(self, element1_id, element2_id, result_id):
+        """Record a recipe and lower the costs it makes cheaper"""
+        recipe = (element1_id, element2_id, result_id)
+        self.uses[element1_id].append(recipe)
+        if element2_id != element1_id:
+            self.uses[element2_id].append(recipe)
+
+        if element1_id in self.cost and element2_id in self.cost:
+            self._propagate([self._candidate(recipe)])
+
+    def rebuild(self, base_ids):
+        """Recompute every cost from the given base elements"""
+        self.base_ids = set(base_ids)
+        self.cost.clear()
+        self.best_recipe.clear()
+        self._propagate([(0, element_id, ()) for element_id in self.base_ids])
+
+    def _candidate(self, recipe, cost=None):
+        cost = self.cost if cost is None else cost
+        element1_id, element2_id, result_id = recipe
+        return 1 + cost[element1_id] + cost[element2_id], result_id, recipe
+
+    def _propagate(self, candidates, cost=None, best_recipe=None, target_id=None):
+        """Settle elements cheapest first, relaxing the recipes they take part in.
+
+        Updates the stored costs unless other cost and best_recipe maps are
+        given. With target_id, stops as soon as that element is settled.
+        """
+        cost = self.cost if cost is None else cost
+        best_recipe = self.best_recipe if best_recipe is None else best_recipe
+        heap = list(candidates)
+        heapq.heapify(heap)
+        while heap:
+            element_cost, element_id, recipe = heapq.heappop(heap)
+            if element_cost >= cost.get(element_id, element_cost + 1):
+                continue
+            cost[element_id] = element_cost
+            if recipe:
+                best_recipe[element_id] = recipe
+            if element_id == target_id:
+                return
+
+            for use in self.uses.get(element_id, ()):
+                element1_id, element2_id, result_id = use
+                if element1_id in cost and element2_id in cost:
+                    candidate = self._candidate(use, cost)
+                    if candidate[0] < cost.get(result_id, candidate[0] + 1):
+                        heapq.heappush(heap, candidate)
+
+    def crafting_steps(self, target_id, known_ids=()):
+        """Return the (first, second, result) steps that make target_id, in crafting order.
+
+        Elements in known_ids (or the base elements when it's empty) are
+        taken as already available. From the base elements the stored best
+        recipes are used; from any other set a search seeded with that set
+        at cost 0 runs until the target is settled, so the steps are the
+        cheapest from what the player already has. Shared ingredients are
+        made once. Returns None if the target can't be made.
+        """
+        known = set(known_ids) or self.base_ids
+        if known == self.base_ids:
+            cost, best_recipe = self.cost, self.best_recipe
+        else:
+            cost, best_recipe = {}, {}
+            self._propagate([(0, element_id, ()) for element_id in known], cost, best_recipe, target_id)
+
+        if target_id not in cost:
+            return None
+
+        steps = []
+        made = set()
+        # Iterative post-order walk, so deep trees don't hit the recursion limit
+        stack = [(target_id, False)]
+        while stack:
+            element_id, expanded = stack.pop()
+            if element_id in known or element_id in made:
+                continue
+            recipe = best_recipe.get(element_id)
+            if recipe is None:
+                continue
+            if expanded:
+                made.add(element_id)
+                steps.append(recipe)
+                continue
+            stack.append((element_id, True))
+            stack.append((recipe[1], False))
+            stack.append((recipe[0], False))
+
+        return steps
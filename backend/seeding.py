@@ -0,0 +1,450 @@
+import json
+import logging
+import uuid
+from itertools import islice
+
+from pymongo import DeleteOne, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+import bitmap
+
+logger = logging.getLogger(__name__)
+
+BASE_ELEMENTS = [
+    ("Water", "💧"),
+    ("Fire", "🔥"),
+    ("Wind", "💨"),
+    ("Earth", "🌍")
+]
+
+def pair_key(element1_id, element2_id):
+    """Return the canonical, order-independent key for a pair of element IDs"""
+    first, second = sorted((element1_id, element2_id))
+    return f"{first}|{second}"
+
+def element_key(name, emoji):
+    """Return the key recipes use to refer to an element, e.g. "💧 Water" """
+    return f"{emoji} {name}"
+
+def seed_element_keys(combinations_data):
+    """Return the base element keys plus every key the recipes mention, in order"""
+    element_keys = {element_key(name, emoji): None for name, emoji in BASE_ELEMENTS}
+    for combo in combinations_data:
+        element_keys.update(dict.fromkeys((combo["element1"], combo["element2"], combo["result"])))
+    return list(element_keys)
+
+def plan_new_elements(element_keys, element_map):
+    """Assign IDs to every element key missing from element_map.
+
+    element_map is updated in place; the returned list holds the element
+    documents that still have to be written.
+    """
+    new_elements = []
+    for key in element_keys:
+        if key not in element_map:
+            emoji, name = key.split(" ", 1)
+            element_map[key] = str(uuid.uuid4())
+            new_elements.append({"id": element_map[key], "name": name, "emoji": emoji})
+
+    return new_elements
+
+async def allocate_seqs(db, count):
+    """Reserve `count` consecutive element seqs and return them as a range.
+
+    Seqs are the dense integer IDs elements are stored under in memory and
+    in player progress; the UUID stays the public ID.
+    """
+    counter = await db.counters.find_one_and_update(
+        {"_id": "elements"},
+        {"$inc": {"seq": count}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return range(counter["seq"] - count, counter["seq"])
+
+def plan_recipes(combinations_data, element_map):
+    """Build recipe documents, keeping the first recipe listed for each pair"""
+    recipes = {}
+    for combo in combinations_data:
+        element1_id = element_map[combo["element1"]]
+        element2_id = element_map[combo["element2"]]
+        key = pair_key(element1_id, element2_id)
+        recipes.setdefault(key, {
+            "pair_key": key,
+            "element1_id": element1_id,
+            "element2_id": element2_id,
+            "result_id": element_map[combo["result"]]
+        })
+
+    return list(recipes.values())
+
+async def load_element_map(db, element_keys):
+    """Return a mapping of the given element keys ("💧 Water") to stored element IDs"""
+    wanted = set(element_keys)
+    names = list({key.split(" ", 1)[1] for key in wanted})
+
+    element_map = {}
+    async for element in db.elements.find({"name": {"$in": names}}, {"_id": 0, "id": 1, "name": 1, "emoji": 1}):
+        key = element_key(element["name"], element["emoji"])
+        if key in wanted:
+            element_map.setdefault(key, element["id"])
+    return element_map
+
+async def backfill_pair_keys(db, batch_size=1000):
+    """Give recipes stored before pair keys existed their pair_key.
+
+    Older documents may hold the same pair more than once, in either
+    order. The oldest recipe for a pair is kept, as the old lookup found
+    it first, and the others are deleted. A recipe is only deleted when a
+    different document holds its key, so workers backfilling at the same
+    time agree on which one to keep. Returns the number of recipes backfilled.
+    """
+    backfilled = 0
+    owners = {}
+    cursor = db.combinations.find(
+        {"pair_key": {"$exists": False}},
+        {"_id": 1, "element1_id": 1, "element2_id": 1}
+    ).sort("_id", 1)
+    # Read everything first; setting pair_key under an open cursor could revisit documents
+    recipes = await cursor.to_list(length=None)
+
+    for batch in batched(recipes, batch_size):
+        keys = [pair_key(recipe["element1_id"], recipe["element2_id"]) for recipe in batch]
+        # Includes recipes another worker keyed since they were read, possibly from this batch
+        async for existing in db.combinations.find({"pair_key": {"$in": keys}}, {"_id": 1, "pair_key": 1}).sort("_id", 1):
+            owners.setdefault(existing["pair_key"], existing["_id"])
+
+        operations = []
+        for recipe, key in zip(batch, keys):
+            owner = owners.setdefault(key, recipe["_id"])
+            if owner != recipe["_id"]:
+                operations.append(DeleteOne({"_id": recipe["_id"], "pair_key": {"$exists": False}}))
+            else:
+                operations.append(UpdateOne({"_id": recipe["_id"], "pair_key": {"$exists": False}}, {"$set": {"pair_key": key}}))
+                backfilled += 1
+        await db.combinations.bulk_write(operations, ordered=False)
+
+    if recipes:
+        logger.info(f"Backfilled pair keys on {backfilled} recipes, dropped {len(recipes) - backfilled} duplicates")
+    return backfilled
+
+async def merge_duplicate_elements(db):
+    """Fold elements that share a name and emoji into the oldest copy.
+
+    Recipes, base elements and player progress that refer to a duplicate
+    are pointed at the kept element; a recipe whose pair already exists
+    for the kept element is dropped. Returns the number of duplicates removed.
+    """
+    duplicates = {}
+    pipeline = [
+        {"$sort": {"_id": 1}},
+        {"$group": {"_id": {"name": "$name", "emoji": "$emoji"}, "ids": {"$push": "$id"}}},
+        {"$match": {"ids.1": {"$exists": True}}}
+    ]
+    groups = await db.elements.aggregate(pipeline, allowDiskUse=True).to_list(length=None)
+    for group in groups:
+        kept_id = group["ids"][0]
+        duplicates.update(dict.fromkeys(group["ids"][1:], kept_id))
+    if not duplicates:
+        return 0
+
+    duplicate_ids = list(duplicates)
+    # Read them all first; rewriting pair_key under an open cursor could revisit documents
+    recipes = await db.combinations.find({"$or": [
+        {"element1_id": {"$in": duplicate_ids}},
+        {"element2_id": {"$in": duplicate_ids}},
+        {"result_id": {"$in": duplicate_ids}}
+    ]}).to_list(length=None)
+    for recipe in recipes:
+        element1_id = duplicates.get(recipe["element1_id"], recipe["element1_id"])
+        element2_id = duplicates.get(recipe["element2_id"], recipe["element2_id"])
+        try:
+            await db.combinations.update_one({"_id": recipe["_id"]}, {"$set": {
+                "pair_key": pair_key(element1_id, element2_id),
+                "element1_id": element1_id,
+                "element2_id": element2_id,
+                "result_id": duplicates.get(recipe["result_id"], recipe["result_id"])
+            }})
+        except DuplicateKeyError:
+            await db.combinations.delete_one({"_id": recipe["_id"]})
+
+    for group in groups:
+        kept_id, group_duplicates = group["ids"][0], group["ids"][1:]
+        await db.base_elements.update_many({"id": {"$in": group_duplicates}}, {"$set": {"id": kept_id}})
+        # Swap in the kept ID, drop repeats, and move the version on like a reset does
+        await db.user_progress.update_many({"discovered_elements": {"$in": group_duplicates}}, [{"$set": {
+            "list_offset": {"$add": [{"$ifNull": ["$list_offset", 0]}, {"$size": "$discovered_elements"}, 1]},
+            "discovered_elements": {"$reduce": {
+                "input": {"$map": {
+                    "input": "$discovered_elements",
+                    "in": {"$cond": [{"$in": ["$$this", group_duplicates]}, kept_id, "$$this"]}
+                }},
+                "initialValue": [],
+                "in": {"$cond": [
+                    {"$in": ["$$this", "$$value"]},
+                    "$$value",
+                    {"$concatArrays": ["$$value", ["$$this"]]}
+                ]}
+            }}
+        }}])
+
+    await db.elements.delete_many({"id": {"$in": duplicate_ids}})
+    logger.info(f"Merged {len(duplicates)} duplicate elements")
+    return len(duplicates)
+
+def merge_progress(documents):
+    """Return the fields that fold several progress documents for one user into the first.
+
+    Discovery lists are joined in order without repeats, and the version
+    is moved past every document's, like a reset does, so clients resync.
+    """
+    lists = [document["discovered_elements"] for document in documents if "discovered_elements" in document]
+    if not lists:
+        return {}
+    versions = [
+        document.get("list_offset", 0) + len(document["discovered_elements"])
+        for document in documents if "discovered_elements" in document
+    ]
+    return {
+        "discovered_elements": list(dict.fromkeys(element for discovered in lists for element in discovered)),
+        "list_offset": max(versions) + 1
+    }
+
+async def merge_duplicate_progress(db):
+    """Fold progress documents that share a user_id into the oldest one.
+
+    Concurrent first visits could create a user's progress more than
+    once before user_id was unique. Returns the number of duplicates removed.
+    """
+    removed = 0
+    pipeline = [
+        {"$sort": {"_id": 1}},
+        {"$group": {"_id": "$user_id", "documents": {"$push": "$$ROOT"}}},
+        {"$match": {"documents.1": {"$exists": True}}}
+    ]
+    async for group in db.user_progress.aggregate(pipeline, allowDiskUse=True):
+        kept, duplicates = group["documents"][0], group["documents"][1:]
+        merged = merge_progress(group["documents"])
+        if merged:
+            await db.user_progress.update_one({"_id": kept["_id"]}, {"$set": merged})
+        await db.user_progress.delete_many({"_id": {"$in": [document["_id"] for document in duplicates]}})
+        removed += len(duplicates)
+
+    if removed:
+        logger.info(f"Merged {removed} duplicate progress documents")
+    return removed
+
+async def assign_missing_seqs(db):
+    """Give every element without a seq one, oldest first. Returns how many were assigned."""
+    element_ids = [
+        element["id"]
+        async for element in db.elements.find({"seq": {"$exists": False}}, {"_id": 0, "id": 1}).sort("_id", 1)
+    ]
+    if not element_ids:
+        return 0
+
+    seqs = await allocate_seqs(db, len(element_ids))
+    await bulk_upsert(db.elements, [
+        UpdateOne({"id": element_id, "seq": {"$exists": False}}, {"$set": {"seq": seq}})
+        for element_id, seq in zip(element_ids, seqs)
+    ])
+    logger.info(f"Assigned seqs to {len(element_ids)} elements")
+    return len(element_ids)
+
+def progress_with_seqs(user_progress, seq_by_id):
+    """Return the discovery list and list offset of progress whose list holds element UUIDs, as seqs.
+
+    Order is kept. If an ID no longer resolves, the version is moved on
+    like a reset does, so clients resync.
+    """
+    old_ids = user_progress["discovered_elements"]
+    seqs = [seq_by_id[element_id] for element_id in old_ids if element_id in seq_by_id]
+    list_offset = user_progress.get("list_offset", 0)
+    if len(seqs) != len(old_ids):
+        list_offset += len(old_ids) + 1
+    return {"discovered_elements": seqs, "list_offset": list_offset}
+
+def progress_as_bitmap(user_progress, recent_size=100):
+    """Return the bitmap fields for progress whose list holds element seqs.
+
+    The list, without repeats, becomes the discovery log, so full lists
+    keep their order. The version carries over, and the tail of the list
+    becomes the recent log, so clients keep getting deltas.
+    """
+    seqs = user_progress["discovered_elements"]
+    discovered = list(dict.fromkeys(seqs))
+    return {
+        "chunks": bitmap.encode(discovered),
+        "log": bitmap.encode_log(discovered),
+        "discovery_count": len(discovered),
+        "version": user_progress.get("list_offset", 0) + len(seqs),
+        "recent": seqs[-recent_size:]
+    }
+
+async def convert_progress_to_seqs(db):
+    """Rewrite discovery lists still holding element UUIDs as lists of seqs.
+
+    Returns the number of players converted.
+    """
+    converted = 0
+    async for user_progress in db.user_progress.find({"discovered_elements": {"$type": "string"}}):
+        old_ids = user_progress["discovered_elements"]
+        seq_by_id = {
+            element["id"]: element["seq"]
+            async for element in db.elements.find({"id": {"$in": list(set(old_ids))}}, {"_id": 0, "id": 1, "seq": 1})
+        }
+        await db.user_progress.update_one(
+            {"_id": user_progress["_id"], "discovered_elements": old_ids},
+            {"$set": progress_with_seqs(user_progress, seq_by_id)}
+        )
+        converted += 1
+
+    if converted:
+        logger.info(f"Converted progress of {converted} players to element seqs")
+    return converted
+
+async def convert_progress_to_bitmaps(db, recent_size=100):
+    """Rewrite discovery lists of element seqs as discovery bitmaps.
+
+    Returns the number of players converted.
+    """
+    converted = 0
+    query = {"discovered_elements": {"$exists": True, "$not": {"$type": "string"}}}
+    async for user_progress in db.user_progress.find(query):
+        await db.user_progress.update_one(
+            {"_id": user_progress["_id"], "discovered_elements": user_progress["discovered_elements"]},
+            {
+                "$set": progress_as_bitmap(user_progress, recent_size),
+                "$unset": {"discovered_elements": "", "list_offset": ""}
+            }
+        )
+        converted += 1
+
+    if converted:
+        logger.info(f"Converted progress of {converted} players to discovery bitmaps")
+    return converted
+
+async def ensure_indexes(db):
+    """Create the indexes seeding and recipe lookups rely on"""
+    # One recipe per unordered pair; lookups are a single indexed equality match.
+    # Recipes from before pair keys existed would all index as null, so key them first.
+    await backfill_pair_keys(db)
+    await db.combinations.create_index("pair_key", unique=True)
+    await db.elements.create_index("id", unique=True)
+    # One element per name and emoji, so concurrent get-or-creates can't duplicate it.
+    # Databases from before the index was unique may hold duplicates to merge first.
+    name_index = (await db.elements.index_information()).get("name_1_emoji_1")
+    if not (name_index and name_index.get("unique")):
+        await merge_duplicate_elements(db)
+        if name_index:
+            await db.elements.drop_index("name_1_emoji_1")
+    await db.elements.create_index([("name", 1), ("emoji", 1)], unique=True)
+    # Partial, so elements from before seqs existed don't collide until they get one
+    await db.elements.create_index("seq", unique=True, partialFilterExpression={"seq": {"$exists": True}})
+    # One progress document per user, so concurrent first visits can't duplicate it.
+    # Databases from before the index existed may hold duplicates to merge first.
+    user_index = (await db.user_progress.index_information()).get("user_id_1")
+    if not (user_index and user_index.get("unique")):
+        await merge_duplicate_progress(db)
+    await db.user_progress.create_index("user_id", unique=True)
+
+async def bulk_upsert(collection, operations):
+    """Run upserts in one unordered bulk write, ignoring races on unique keys"""
+    if not operations:
+        return
+    try:
+        await collection.bulk_write(operations, ordered=False)
+    except BulkWriteError as e:
+        # Duplicate keys mean another worker upserted the same documents first
+        if any(error["code"] != 11000 for error in e.details["writeErrors"]):
+            raise
+
+async def seed_database(db, combinations_data):
+    """Upsert base elements, elements and recipes from parsed seed data.
+
+    Everything is resolved in memory first and then written with one bulk
+    write per collection. Existing documents are never overwritten.
+    Returns the number of new elements and the number of recipes in the seed.
+    """
+    element_keys = seed_element_keys(combinations_data)
+    element_map = await load_element_map(db, element_keys)
+    new_elements = plan_new_elements(element_keys, element_map)
+
+    if new_elements:
+        for element, seq in zip(new_elements, await allocate_seqs(db, len(new_elements))):
+            element["seq"] = seq
+        await bulk_upsert(db.elements, [
+            UpdateOne({"name": e["name"], "emoji": e["emoji"]}, {"$setOnInsert": e}, upsert=True)
+            for e in new_elements
+        ])
+        # Another worker may have seeded the same elements concurrently; use the stored IDs
+        element_map = await load_element_map(db, element_keys)
+
+    base_elements = [
+        {"id": element_map[element_key(name, emoji)], "name": name, "emoji": emoji}
+        for name, emoji in BASE_ELEMENTS
+    ]
+    await bulk_upsert(db.base_elements, [
+        UpdateOne({"name": e["name"], "emoji": e["emoji"]}, {"$setOnInsert": e}, upsert=True)
+        for e in base_elements
+    ])
+
+    recipes = plan_recipes(combinations_data, element_map)
+    await bulk_upsert(db.combinations, [
+        UpdateOne({"pair_key": recipe["pair_key"]}, {"$setOnInsert": recipe}, upsert=True)
+        for recipe in recipes
+    ])
+
+    logger.info(f"Seeded {len(new_elements)} new elements and {len(recipes)} combinations")
+    return len(new_elements), len(recipes)
+
+def iter_recipes(path, file_format="auto"):
+    """Yield recipes from a seed file one at a time.
+
+    JSON Lines files (one recipe object per line) are read line by line.
+    JSON arrays are parsed incrementally with ijson when it is installed;
+    without it the whole array has to be loaded first.
+    """
+    if file_format == "auto":
+        file_format = "jsonl" if path.suffix in (".jsonl", ".ndjson") else "json"
+
+    if file_format == "jsonl":
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        return
+
+    try:
+        import ijson
+    except ImportError:
+        logger.warning("ijson is not installed, loading the whole recipe array into memory")
+        with open(path, "r", encoding="utf-8") as f:
+            yield from json.load(f)
+        return
+
+    with open(path, "rb") as f:
+        yield from ijson.items(f, "item")
+
+def batched(iterable, size):
+    """Yield lists of at most `size` items from an iterable"""
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+async def import_recipes(db, path, batch_size=1000, file_format="auto"):
+    """Stream recipes from a file into the database in bounded batches.
+
+    Memory use depends on the batch size, not on the size of the file.
+    Returns the number of new elements and the number of recipes read.
+    """
+    await ensure_indexes(db)
+
+    total_elements = total_recipes = 0
+    for batch in batched(iter_recipes(path, file_format), batch_size):
+        new_elements, recipes = await seed_database(db, batch)
+        total_elements += new_elements
+        total_recipes += len(batch)
+        logger.info(f"Imported {total_recipes} recipes so far ({total_elements} new elements)")
+
+    return total_elements, total_recipes
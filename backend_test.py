@@ -69,5 +69,100 @@ class InfiniteCraftAPITest(unittest.TestCase):
         self.assertEqual(response.status_code, 200)
         print("✅ Reset progress API working")
 
+    def test_6_all_elements_paging(self):
+        """Test cursor-based paging of all elements"""
+        print("\nTesting all elements paging API...")
+        response = requests.get(f"{self.base_url}/elements/all?limit=2")
+        self.assertEqual(response.status_code, 200)
+        first_page = response.json()
+        self.assertTrue(len(first_page) <= 2)
+        
+        next_cursor = response.headers.get("X-Next-Cursor")
+        if next_cursor:
+            response = requests.get(f"{self.base_url}/elements/all?limit=2&after={next_cursor}")
+            self.assertEqual(response.status_code, 200)
+            second_page = response.json()
+            self.assertTrue(all(element["id"] > next_cursor for element in second_page))
+        print("✅ All elements paging API working")
+
+    def test_7_combination_progress_delta(self):
+        """Test that combining returns the progress delta and incremental discoveries"""
+        print("\nTesting combination progress delta...")
+        progress = requests.get(f"{self.base_url}/user/progress?user_id={self.test_user}").json()
+        self.assertIn("version", progress)
+        
+        base_elements = requests.get(f"{self.base_url}/elements/base").json()
+        response = requests.post(f"{self.base_url}/elements/combine", json={
+            "element1_id": base_elements[0]["id"],
+            "element2_id": base_elements[1]["id"],
+            "user_id": self.test_user
+        })
+        data = response.json()
+        self.assertIn("discovery_count", data)
+        self.assertIn("progress_version", data)
+        
+        response = requests.get(
+            f"{self.base_url}/elements/discovered?user_id={self.test_user}&since={progress['version']}"
+        )
+        self.assertEqual(response.status_code, 200)
+        delta = response.json()
+        self.assertEqual(delta["version"], data["progress_version"])
+        if data["new_discovery"]:
+            self.assertEqual([element["id"] for element in delta["elements"]], [data["result"]["id"]])
+        print("✅ Combination progress delta working")
+
+    def test_8_streamed_combination(self):
+        """Test the server-sent events variant of element combination"""
+        print("\nTesting streamed element combination API...")
+        base_elements = requests.get(f"{self.base_url}/elements/base").json()
+        response = requests.post(f"{self.base_url}/elements/combine/stream", json={
+            "element1_id": base_elements[0]["id"],
+            "element2_id": base_elements[1]["id"],
+            "user_id": self.test_user
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/event-stream"))
+        
+        events = [line[len("event: "):] for line in response.text.splitlines() if line.startswith("event: ")]
+        self.assertEqual(events, ["thinking", "result"])
+        print("✅ Streamed element combination API working")
+
+    def test_9_recipe_path(self):
+        """Test the shortest crafting path API"""
+        print("\nTesting recipe path API...")
+        base_elements = requests.get(f"{self.base_url}/elements/base").json()
+        combine_response = requests.post(f"{self.base_url}/elements/combine", json={
+            "element1_id": base_elements[0]["id"],
+            "element2_id": base_elements[1]["id"],
+            "user_id": self.test_user
+        })
+        target = combine_response.json()["result"]
+        
+        response = requests.get(f"{self.base_url}/recipes/path?target={target['id']}")
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertTrue(data["reachable"])
+        self.assertEqual(data["steps"][-1]["result"]["id"], target["id"])
+        
+        missing = requests.get(f"{self.base_url}/recipes/path?target=no-such-element")
+        self.assertEqual(missing.status_code, 404)
+        print("✅ Recipe path API working")
+
+    def test_10_hints(self):
+        """Test the next discovery hints API"""
+        print("\nTesting hints API...")
+        requests.post(f"{self.base_url}/user/reset?user_id={self.test_user}")
+        response = requests.get(f"{self.base_url}/elements/hints?user_id={self.test_user}&limit=2")
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertGreater(data["available"], 0)
+        self.assertLessEqual(len(data["hints"]), 2)
+        
+        base_ids = {element["id"] for element in requests.get(f"{self.base_url}/elements/base").json()}
+        for hint in data["hints"]:
+            self.assertIn(hint["element1"]["id"], base_ids)
+            self.assertIn(hint["element2"]["id"], base_ids)
+        print("✅ Hints API working")
+
 if __name__ == "__main__":
     unittest.main(verbosity=2)
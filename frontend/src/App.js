@@ -23,6 +23,8 @@ function App() {
   // Removed tabs state
   const workspaceRef = useRef(null);
   const resultTimeoutRef = useRef(null);
+  // Server progress version our discovered elements are in sync with
+  const progressVersionRef = useRef(null);
   
   // Canvas animation for subtle effects
   const canvasRef = useRef(null);
@@ -234,11 +236,38 @@ function App() {
       );
       const data = await response.json();
       setDiscoveryCount(data.discovery_count);
+      progressVersionRef.current = data.version;
     } catch (error) {
       console.error("Error fetching user progress:", error);
     }
   };
 
+  // Fetch only the elements discovered since a known progress version
+  const fetchDiscoveredSince = async (version) => {
+    try {
+      const userId = localStorage.getItem("infiniteCraftUsername") || "default";
+      const response = await fetch(
+        `${BACKEND_URL}/api/elements/discovered?user_id=${userId}&since=${version}`
+      );
+      if (!response.ok) {
+        throw new Error(`HTTP error! Status: ${response.status}`);
+      }
+      const data = await response.json();
+      progressVersionRef.current = data.version;
+      
+      setDiscoveredElements(prevElements => {
+        if (data.full) {
+          return data.elements;
+        }
+        const existingIds = new Set(prevElements.map(elem => elem.id));
+        const newElements = data.elements.filter(elem => !existingIds.has(elem.id));
+        return newElements.length > 0 ? [...prevElements, ...newElements] : prevElements;
+      });
+    } catch (error) {
+      console.error("Error fetching new discoveries:", error);
+    }
+  };
+
   const resetProgress = async () => {
     try {
       const userId = localStorage.getItem("infiniteCraftUsername") || "default";
@@ -450,9 +479,19 @@ function App() {
           return prevDiscovered;
         });
 
-        // Also fetch from server to ensure consistency
-        fetchDiscoveredElements();
-        fetchUserProgress();
+        // The response carries the progress delta; only catch up with the
+        // server when it has changes we didn't make (e.g. from another tab)
+        setDiscoveryCount(data.discovery_count);
+        const previousVersion = progressVersionRef.current;
+        const expectedVersion = previousVersion + (data.new_discovery ? 1 : 0);
+        if (previousVersion === null) {
+          fetchDiscoveredElements();
+          fetchUserProgress();
+        } else if (data.progress_version !== expectedVersion) {
+          fetchDiscoveredSince(previousVersion);
+        } else {
+          progressVersionRef.current = data.progress_version;
+        }
       } else {
         // Show failure animation/message
         setCombinationResult({
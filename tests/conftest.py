@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Backend modules import each other flatly, as they do when uvicorn runs from backend/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
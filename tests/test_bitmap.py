@@ -0,0 +1,70 @@
+import random
+
+import bitmap
+
+
+def test_round_trip_across_chunks():
+    seqs = [0, 1, 65535, 65536, 70000, 5 << 16 | 7]
+    chunks = bitmap.encode(reversed(seqs))
+    assert sorted(chunks, key=int) == ["0", "1", "5"]
+    assert bitmap.decode(chunks) == seqs
+    assert all(bitmap.contains(chunks, seq) for seq in seqs)
+    assert not bitmap.contains(chunks, 2)
+    assert not bitmap.contains(chunks, 3 << 16)
+
+
+def test_sparse_chunks_are_sorted_arrays():
+    chunks = bitmap.encode([300, 10, 20000])
+    assert len(chunks["0"]) == 6
+    assert bitmap.container_values(chunks["0"]) == [10, 300, 20000]
+
+
+def test_chunk_becomes_a_bitmap_when_the_array_fills_up():
+    values = list(range(0, 2 * (bitmap.ARRAY_MAX - 1), 2))
+    container = bitmap.encode(values)["0"]
+    assert len(container) == 2 * (bitmap.ARRAY_MAX - 1)
+
+    container = bitmap.container_add(container, 1)
+    assert len(container) == bitmap.BITMAP_BYTES
+    assert bitmap.container_values(container) == sorted(values + [1])
+    assert bitmap.container_contains(container, 1)
+    assert not bitmap.container_contains(container, 3)
+
+    container = bitmap.container_add(container, 65535)
+    assert bitmap.container_contains(container, 65535)
+
+
+def test_adding_matches_encoding():
+    random.seed(7)
+    seqs = random.sample(range(1 << 18), 5000)
+    chunks = {}
+    for seq in seqs:
+        key, low = bitmap.chunk_field(seq)
+        assert not bitmap.container_contains(chunks.get(key), low)
+        chunks[key] = bitmap.container_add(chunks.get(key), low)
+    assert bitmap.decode(chunks) == sorted(seqs)
+    assert chunks == bitmap.encode(seqs)
+
+
+def test_adding_twice_is_a_no_op():
+    container = bitmap.container_add(None, 5)
+    assert bitmap.container_add(container, 5) == container
+
+
+def test_log_keeps_discovery_order():
+    seqs = [9, 3, 70000, 1]
+    assert bitmap.decode_log(bitmap.encode_log(seqs)) == seqs
+    assert bitmap.encode_log([]) == []
+
+
+def test_log_append_fills_segments_then_starts_new_ones():
+    log = []
+    for length, seq in enumerate(range(1000, 1000 + bitmap.LOG_SEGMENT + 2)):
+        index, segment = bitmap.log_append(log[-1] if log else None, length, seq)
+        if index == len(log):
+            log.append(segment)
+        else:
+            log[index] = segment
+    assert len(log) == 2
+    assert bitmap.decode_log(log) == list(range(1000, 1000 + bitmap.LOG_SEGMENT + 2))
+    assert log == bitmap.encode_log(range(1000, 1000 + bitmap.LOG_SEGMENT + 2))
@@ -0,0 +1,164 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+from prometheus_client import REGISTRY
+
+from engines import CombinationEngine, DeterministicEngine, OpenAIEngine, create_combination_engine, ends_with_emoji
+from rate_limit import LLMLimiter, LLMOverloaded
+
+API_URL = "http://llm.test/v1/chat/completions"
+
+
+def streaming_engine(deltas, reads, usage=None, requests=None):
+    """An engine whose provider streams the deltas and a finish chunk.
+
+    With usage, a usage report and [DONE] follow; without, the stream never ends.
+    """
+    async def body():
+        for delta in deltas:
+            reads.append(delta)
+            event = {"choices": [{"index": 0, "delta": {"content": delta}, "finish_reason": None}]}
+            yield f"data: {json.dumps(event)}\n\n".encode()
+        reads.append("finish")
+        yield b'data: {"choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}\n\n'
+        if usage:
+            reads.append("usage")
+            yield f"data: {json.dumps({'choices': [], 'usage': usage})}\n\ndata: [DONE]\n\n".encode()
+            return
+        # A stream read to the end would hang here
+        await asyncio.Event().wait()
+
+    def handler(request):
+        if requests is not None:
+            requests.append(json.loads(request.content))
+        return httpx.Response(200, content=body(), headers={"Content-Type": "text/event-stream"})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return OpenAIEngine(client, LLMLimiter(), API_URL, api_key="", stream=True)
+
+
+def complete_with_timeout(engine, input_text):
+    return asyncio.run(asyncio.wait_for(engine.complete(input_text), timeout=1))
+
+
+def test_stream_is_closed_once_the_answer_is_complete():
+    reads = []
+    engine = streaming_engine(["Ste", "am", " ♨", "️"], reads)
+    assert complete_with_timeout(engine, "💧 Water + 🔥 Fire") == "Steam ♨️"
+    assert reads[-1] == "finish"
+
+
+def test_stream_keeps_reading_through_joined_emoji():
+    reads = []
+    engine = streaming_engine(["Chef", " 👨", "‍", "🍳"], reads)
+    assert complete_with_timeout(engine, "👤 Human + 🔥 Fire") == "Chef 👨‍🍳"
+
+
+def test_stream_stops_before_extra_text():
+    reads = []
+    engine = streaming_engine(["Mud", " 🟤", " because", " earth"], reads)
+    assert complete_with_timeout(engine, "💧 Water + 🌍 Earth") == "Mud 🟤"
+    assert "earth" not in reads
+
+
+def token_count(engine, kind):
+    return REGISTRY.get_sample_value("llm_tokens_total", {"engine": engine, "kind": kind}) or 0
+
+
+def test_stream_records_the_reported_usage():
+    reads, requests = [], []
+    engine = streaming_engine(["Ste", "am", " ♨", "️"], reads, usage={"prompt_tokens": 40, "completion_tokens": 5}, requests=requests)
+    before = token_count("openai", "prompt"), token_count("openai", "completion")
+
+    async def run():
+        result = await asyncio.wait_for(engine.complete("💧 Water + 🔥 Fire"), timeout=1)
+        await asyncio.wait_for(asyncio.gather(*engine.streams), timeout=1)
+        return result
+
+    assert asyncio.run(run()) == "Steam ♨️"
+    assert requests[0]["stream_options"] == {"include_usage": True}
+    assert reads[-1] == "usage"
+    assert token_count("openai", "prompt") == before[0] + 40
+    assert token_count("openai", "completion") == before[1] + 5
+
+
+def test_stream_waiting_for_usage_is_closed_after_a_while():
+    reads = []
+    engine = streaming_engine(["Ste", "am", " ♨", "️"], reads)
+    engine.usage_wait_seconds = 0.05
+
+    async def run():
+        result = await asyncio.wait_for(engine.complete("💧 Water + 🔥 Fire"), timeout=1)
+        assert engine.streams
+        await asyncio.sleep(0.2)
+        return result
+
+    assert asyncio.run(run()) == "Steam ♨️"
+    assert not engine.streams
+
+
+def test_stream_frees_its_limiter_slot_once_answered():
+    reads = []
+    engine = streaming_engine(["Ste", "am", " ♨", "️"], reads)
+
+    async def run():
+        result = await asyncio.wait_for(engine.complete("💧 Water + 🔥 Fire"), timeout=1)
+        # Still waiting for the usage report, but no longer counted as in flight
+        assert engine.streams
+        assert engine.limiter.in_flight == 0
+        return result
+
+    assert asyncio.run(run()) == "Steam ♨️"
+
+
+def test_stream_shed_by_the_limiter_raises():
+    engine = streaming_engine(["Ste", "am", " ♨", "️"], [])
+    engine.limiter = LLMLimiter(max_queue=0)
+
+    with pytest.raises(LLMOverloaded):
+        complete_with_timeout(engine, "💧 Water + 🔥 Fire")
+
+
+def test_ends_with_emoji():
+    assert ends_with_emoji("Steam ♨")
+    assert not ends_with_emoji("Steam")
+    assert not ends_with_emoji("🔥")
+    assert not ends_with_emoji("Chef 👨‍")
+
+
+
+def test_deterministic_engine_is_order_independent_and_seeded():
+    engine = DeterministicEngine()
+    engine.seed([("Steam", "♨️"), ("Mud", "🟤"), ("Lava", "🌋")])
+    first = asyncio.run(engine.complete("💧 Water + 🔥 Fire"))
+    assert first == asyncio.run(engine.complete("🔥 Fire  + 💧 Water"))
+    assert first in {"Steam ♨️", "Mud 🟤", "Lava 🌋"}
+
+
+def test_deterministic_engine_batches_per_input():
+    engine = DeterministicEngine()
+    inputs = ["💧 Water + 🔥 Fire", "💨 Wind + 🌍 Earth"]
+    results = asyncio.run(engine.complete_batch(inputs))
+    assert results == [asyncio.run(engine.complete(text)) for text in inputs]
+
+
+def test_engines_must_implement_complete():
+    class Incomplete(CombinationEngine):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_create_combination_engine_rejects_unknown_backends():
+    assert isinstance(create_combination_engine("deterministic"), DeterministicEngine)
+    with pytest.raises(ValueError):
+        create_combination_engine("carrier-pigeon")
+
+
+def test_openai_engine_needs_an_api_key():
+    with pytest.raises(ValueError, match="OPENAI_API_KEY"):
+        create_combination_engine("openai", api_url=API_URL, api_key="")
+    assert isinstance(create_combination_engine("openai", api_url=API_URL, api_key="sk-test"), OpenAIEngine)
@@ -0,0 +1,38 @@
+from hints import RecipeTable
+
+
+def build(recipes, capacity=1024):
+    table = RecipeTable(capacity=capacity)
+    for recipe in recipes:
+        table.add_recipe(*recipe)
+    return table
+
+
+def test_recipes_need_both_inputs_and_a_new_result():
+    table = build([(0, 1, 2), (0, 2, 3), (1, 1, 4), (0, 0, 1)])
+    assert table.next_discoveries([0, 1]) == [(0, 1, 2), (1, 1, 4)]
+    assert table.next_discoveries([0, 1, 2]) == [(0, 2, 3), (1, 1, 4)]
+
+
+def test_one_recipe_per_result_in_recipe_order():
+    table = build([(0, 1, 5), (1, 0, 5), (0, 0, 6), (1, 1, 5)])
+    assert table.next_discoveries([0, 1]) == [(0, 1, 5), (0, 0, 6)]
+
+
+def test_table_grows_past_its_capacity():
+    table = build([(0, 0, seq) for seq in range(1, 10)], capacity=2)
+    assert table.size == 9
+    assert table.element_count == 10
+    assert [recipe[2] for recipe in table.next_discoveries([0])] == list(range(1, 10))
+
+
+def test_discoveries_newer_than_every_recipe_are_ignored():
+    table = build([(0, 1, 2)])
+    assert table.next_discoveries([0, 1, 50]) == [(0, 1, 2)]
+    assert table.next_discoveries([]) == []
+
+
+def test_clear_forgets_recipes():
+    table = build([(0, 1, 2)])
+    table.clear()
+    assert table.next_discoveries([0, 1]) == []
@@ -0,0 +1,89 @@
+import asyncio
+
+from llm_batch import MicroBatcher
+
+
+def test_submissions_within_the_window_share_one_batch():
+    batches = []
+
+    async def process_batch(items):
+        batches.append(items)
+        return [item.upper() for item in items]
+
+    async def scenario():
+        batcher = MicroBatcher(process_batch, window_seconds=0.01, max_batch_size=16)
+        return await asyncio.gather(*(batcher.submit(item) for item in ["a", "b", "c"]))
+
+    assert asyncio.run(scenario()) == ["A", "B", "C"]
+    assert batches == [["a", "b", "c"]]
+
+
+def test_full_batch_is_flushed_without_waiting_for_the_window():
+    batches = []
+
+    async def process_batch(items):
+        batches.append(items)
+        return items
+
+    async def scenario():
+        batcher = MicroBatcher(process_batch, window_seconds=60, max_batch_size=2)
+        return await asyncio.wait_for(asyncio.gather(batcher.submit(1), batcher.submit(2)), timeout=1)
+
+    assert asyncio.run(scenario()) == [1, 2]
+    assert batches == [[1, 2]]
+
+
+def test_item_errors_go_only_to_their_caller():
+    async def process_batch(items):
+        return [ValueError(item) if item == "bad" else item for item in items]
+
+    async def scenario():
+        batcher = MicroBatcher(process_batch, window_seconds=0.01)
+        return await asyncio.gather(batcher.submit("good"), batcher.submit("bad"), return_exceptions=True)
+
+    good, bad = asyncio.run(scenario())
+    assert good == "good"
+    assert isinstance(bad, ValueError)
+
+
+def test_batch_errors_go_to_every_caller():
+    async def process_batch(items):
+        raise RuntimeError("provider down")
+
+    async def scenario():
+        batcher = MicroBatcher(process_batch, window_seconds=0.01)
+        return await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_separate_windows_make_separate_batches():
+    batches = []
+
+    async def process_batch(items):
+        batches.append(items)
+        return items
+
+    async def scenario():
+        batcher = MicroBatcher(process_batch, window_seconds=0.01)
+        await batcher.submit(1)
+        await batcher.submit(2)
+
+    asyncio.run(scenario())
+    assert batches == [[1], [2]]
+
+
+def test_bursts_larger_than_a_batch_are_split():
+    batches = []
+
+    async def process_batch(items):
+        batches.append(items)
+        return items
+
+    async def scenario():
+        batcher = MicroBatcher(process_batch, window_seconds=0.01, max_batch_size=2)
+        return await asyncio.gather(*(batcher.submit(item) for item in range(5)))
+
+    assert asyncio.run(scenario()) == [0, 1, 2, 3, 4]
+    assert batches == [[0, 1], [2, 3], [4]]
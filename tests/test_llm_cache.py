@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+
+from llm_cache import NullLLMCache, SQLiteLLMCache, cache_key, create_llm_cache
+
+
+def test_cache_key_ignores_whitespace_differences():
+    assert cache_key("m", "prompt", "💧 Water +  🔥 Fire ") == cache_key("m", "prompt", "💧 Water + 🔥 Fire")
+    assert cache_key("m", "prompt", "a") != cache_key("other", "prompt", "a")
+
+
+def test_sqlite_cache_round_trip(tmp_path):
+    cache = SQLiteLLMCache(tmp_path / "cache.sqlite3")
+    try:
+        assert asyncio.run(cache.get("k")) is None
+        asyncio.run(cache.set("k", "Steam ♨️"))
+        assert asyncio.run(cache.get("k")) == "Steam ♨️"
+    finally:
+        cache.close()
+
+
+def test_sqlite_cache_survives_reopening(tmp_path):
+    cache = SQLiteLLMCache(tmp_path / "cache.sqlite3")
+    asyncio.run(cache.set("k", "Mud 🟤"))
+    cache.close()
+
+    reopened = SQLiteLLMCache(tmp_path / "cache.sqlite3")
+    try:
+        assert asyncio.run(reopened.get("k")) == "Mud 🟤"
+    finally:
+        reopened.close()
+
+
+def test_null_cache_stores_nothing():
+    cache = NullLLMCache()
+    asyncio.run(cache.set("k", "Steam ♨️"))
+    assert asyncio.run(cache.get("k")) is None
+
+
+def test_sqlite_cache_evicts_least_recently_used_down_to_90_percent(tmp_path):
+    # Each entry is 1 (key) + 100 (value) = 101 bytes
+    cache = SQLiteLLMCache(tmp_path / "cache.sqlite3", max_bytes=505)
+    try:
+        for key in "abcde":
+            cache._set(key, "x" * 100)
+        # Touch "a" so "b" becomes the least recently used entry
+        assert cache._get("a") is not None
+        cache._set("f", "x" * 100)
+
+        remaining = {row[0] for row in cache.conn.execute("SELECT key FROM llm_cache")}
+        total = cache.conn.execute("SELECT SUM(size) FROM llm_cache").fetchone()[0]
+        assert "b" not in remaining
+        assert {"a", "f"} <= remaining
+        assert total <= 505 * 0.9
+    finally:
+        cache.close()
+
+
+def test_create_llm_cache_backends(tmp_path):
+    assert isinstance(create_llm_cache("none", None, 0), NullLLMCache)
+    cache = create_llm_cache("sqlite", tmp_path / "cache.sqlite3", 1024)
+    cache.close()
+    with pytest.raises(ValueError):
+        create_llm_cache("redis", None, 0)
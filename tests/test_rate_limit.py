@@ -0,0 +1,108 @@
+import asyncio
+
+import pytest
+
+from rate_limit import LLMLimiter, LLMOverloaded, LLMUnavailable, TokenBucket
+
+
+def test_token_bucket_spends_burst_then_queues_reservations():
+    bucket = TokenBucket(rate=10, burst=2)
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.0
+    # Later callers queue up behind earlier reservations
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+    assert bucket.reserve() == pytest.approx(0.2, abs=0.01)
+
+
+def test_token_bucket_refund_gives_the_token_back():
+    bucket = TokenBucket(rate=10, burst=1)
+    bucket.reserve()
+    bucket.refund()
+    assert bucket.reserve() == 0.0
+
+
+def test_overloaded_is_retryable():
+    error = LLMOverloaded("busy", retry_after=3)
+    assert isinstance(error, LLMUnavailable)
+    assert error.retry_after == 3
+
+
+def test_limiter_admits_calls_and_reports_stats():
+    async def scenario():
+        limiter = LLMLimiter(max_concurrency=2, rate_per_second=100, burst=10)
+        async with limiter.slot():
+            assert limiter.stats()["in_flight"] == 1
+        return limiter.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["admitted"] == 1
+    assert stats["in_flight"] == 0
+    assert stats["shed"] == 0
+
+
+def test_limiter_sheds_when_no_slot_frees_up_in_time():
+    async def scenario():
+        limiter = LLMLimiter(max_concurrency=1, rate_per_second=100, burst=10, max_wait_seconds=0.05)
+        async with limiter.slot():
+            with pytest.raises(LLMOverloaded):
+                async with limiter.slot():
+                    pass
+        # The slot is usable again once released
+        async with limiter.slot():
+            pass
+        return limiter.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["shed"] == 1
+    assert stats["admitted"] == 2
+    assert stats["queue_depth"] == 0
+
+
+def test_limiter_sheds_immediately_when_queue_is_full():
+    async def scenario():
+        limiter = LLMLimiter(max_concurrency=1, rate_per_second=100, burst=10, max_queue=1, max_wait_seconds=1.0)
+        release = asyncio.Event()
+
+        async def hold():
+            async with limiter.slot():
+                await release.wait()
+
+        async def wait_for_slot():
+            async with limiter.slot():
+                pass
+
+        holder = asyncio.ensure_future(hold())
+        await asyncio.sleep(0.01)
+        waiter = asyncio.ensure_future(wait_for_slot())
+        await asyncio.sleep(0.01)
+        assert limiter.stats()["queue_depth"] == 1
+
+        with pytest.raises(LLMOverloaded, match="queued"):
+            async with limiter.slot():
+                pass
+
+        release.set()
+        await asyncio.gather(holder, waiter)
+        return limiter.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["shed"] == 1
+    assert stats["admitted"] == 2
+
+
+def test_limiter_sheds_and_refunds_when_rate_wait_exceeds_deadline():
+    async def scenario():
+        limiter = LLMLimiter(max_concurrency=4, rate_per_second=1, burst=1, max_wait_seconds=0.1)
+        async with limiter.slot():
+            pass
+        with pytest.raises(LLMOverloaded, match="rate limit") as raised:
+            async with limiter.slot():
+                pass
+        # The refused reservation was refunded, so the next wait is not pushed further out
+        assert limiter.bucket.tokens == pytest.approx(0.0, abs=0.01)
+        # ...and its concurrency slot was released
+        assert limiter.semaphore._value == 4
+        return raised.value
+
+    error = asyncio.run(scenario())
+    assert error.retry_after >= 1.0
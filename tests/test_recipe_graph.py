@@ -0,0 +1,49 @@
+from recipe_graph import RecipeGraph
+
+
+def build(recipes, base_ids):
+    graph = RecipeGraph()
+    for recipe in recipes:
+        graph.add_recipe(*recipe)
+    graph.rebuild(base_ids)
+    return graph
+
+
+def test_costs_count_combines_from_the_base_elements():
+    graph = build([(0, 1, 2), (0, 2, 3), (2, 3, 4)], [0, 1])
+    assert graph.cost == {0: 0, 1: 0, 2: 1, 3: 2, 4: 4}
+    assert graph.crafting_steps(4) == [(0, 1, 2), (0, 2, 3), (2, 3, 4)]
+
+
+def test_shared_ingredients_are_made_once():
+    graph = build([(0, 1, 2), (2, 2, 3)], [0, 1])
+    assert graph.crafting_steps(3) == [(0, 1, 2), (2, 2, 3)]
+
+
+def test_unreachable_and_base_targets():
+    graph = build([(0, 1, 2), (8, 9, 10)], [0, 1])
+    assert graph.crafting_steps(10) is None
+    assert graph.crafting_steps(0) == []
+
+
+def test_new_recipes_lower_costs_incrementally():
+    graph = build([(0, 1, 2), (2, 2, 3), (3, 3, 4)], [0, 1])
+    assert graph.cost[4] == 7
+    graph.add_recipe(0, 0, 3)
+    assert graph.cost[3] == 1
+    assert graph.cost[4] == 3
+    assert graph.crafting_steps(4) == [(0, 0, 3), (3, 3, 4)]
+
+
+def test_steps_start_from_what_the_player_has_discovered():
+    # The cheapest way from the base is through 9, but the player already has 7 and 10
+    recipes = [(0, 1, 9), (9, 9, 5), (0, 0, 6), (6, 6, 7), (7, 7, 8), (8, 8, 10), (7, 10, 5)]
+    graph = build(recipes, [0, 1])
+    assert graph.best_recipe[5] == (9, 9, 5)
+    assert graph.crafting_steps(5, known_ids=[0, 1, 7, 10]) == [(7, 10, 5)]
+
+
+def test_steps_from_discoveries_make_missing_ingredients():
+    graph = build([(0, 1, 2), (2, 1, 3), (3, 0, 4)], [0, 1])
+    assert graph.crafting_steps(4, known_ids=[0, 1, 2]) == [(2, 1, 3), (3, 0, 4)]
+    assert graph.crafting_steps(4, known_ids=[0, 1, 4]) == []
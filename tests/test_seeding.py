@@ -0,0 +1,102 @@
+import json
+
+import bitmap
+from seeding import (
+    batched,
+    iter_recipes,
+    merge_progress,
+    pair_key,
+    plan_recipes,
+    progress_as_bitmap,
+    progress_with_seqs,
+    seed_element_keys
+)
+
+
+def test_merge_progress_joins_lists_and_moves_the_version_on():
+    documents = [
+        {"user_id": "u", "discovered_elements": ["water", "fire", "steam"]},
+        {"user_id": "u", "discovered_elements": ["water", "fire", "mud", "steam"], "list_offset": 2}
+    ]
+    merged = merge_progress(documents)
+    assert merged["discovered_elements"] == ["water", "fire", "steam", "mud"]
+    # The second document was at version 6; every client has to resync
+    assert merged["list_offset"] == 7
+    assert merged["list_offset"] + len(merged["discovered_elements"]) > 6
+
+
+def test_merge_progress_without_lists_changes_nothing():
+    assert merge_progress([{"user_id": "u", "chunks": {}}, {"user_id": "u"}]) == {}
+
+
+def test_seed_element_keys_start_with_the_base_elements_without_repeats():
+    combinations = [
+        {"element1": "💧 Water", "element2": "🔥 Fire", "result": "♨️ Steam"},
+        {"element1": "♨️ Steam", "element2": "🌍 Earth", "result": "🌋 Geyser"}
+    ]
+    assert seed_element_keys(combinations) == ["💧 Water", "🔥 Fire", "💨 Wind", "🌍 Earth", "♨️ Steam", "🌋 Geyser"]
+
+
+def test_plan_recipes_keeps_the_first_recipe_for_each_pair():
+    element_map = {"💧 Water": "w", "🔥 Fire": "f", "♨️ Steam": "s", "🌫️ Fog": "g"}
+    recipes = plan_recipes([
+        {"element1": "💧 Water", "element2": "🔥 Fire", "result": "♨️ Steam"},
+        {"element1": "🔥 Fire", "element2": "💧 Water", "result": "🌫️ Fog"},
+        {"element1": "💧 Water", "element2": "💧 Water", "result": "🌫️ Fog"}
+    ], element_map)
+    assert recipes == [
+        {"pair_key": pair_key("w", "f"), "element1_id": "w", "element2_id": "f", "result_id": "s"},
+        {"pair_key": "w|w", "element1_id": "w", "element2_id": "w", "result_id": "g"}
+    ]
+
+
+def test_batched_yields_bounded_batches():
+    assert list(batched(range(7), 3)) == [[0, 1, 2], [3, 4, 5], [6]]
+    assert list(batched(range(6), 3)) == [[0, 1, 2], [3, 4, 5]]
+    assert list(batched([], 3)) == []
+
+
+RECIPES = [
+    {"element1": "💧 Water", "element2": "🔥 Fire", "result": "♨️ Steam"},
+    {"element1": "💧 Water", "element2": "🌍 Earth", "result": "🟤 Mud"}
+]
+
+
+def test_iter_recipes_reads_json_lines_skipping_blank_lines(tmp_path):
+    path = tmp_path / "recipes.jsonl"
+    path.write_text("\n".join(json.dumps(recipe, ensure_ascii=False) for recipe in RECIPES) + "\n\n", encoding="utf-8")
+    assert list(iter_recipes(path)) == RECIPES
+
+
+def test_iter_recipes_reads_json_arrays(tmp_path):
+    path = tmp_path / "recipes.json"
+    path.write_text(json.dumps(RECIPES, ensure_ascii=False), encoding="utf-8")
+    assert list(iter_recipes(path)) == RECIPES
+    # The format can be given explicitly whatever the file is called
+    other = tmp_path / "recipes.txt"
+    other.write_text(path.read_text(encoding="utf-8"), encoding="utf-8")
+    assert list(iter_recipes(other, file_format="json")) == RECIPES
+
+
+def test_progress_conversions_round_trip():
+    user_progress = {"user_id": "u", "discovered_elements": ["water", "fire", "steam", "fire", "mud"], "list_offset": 3}
+    seq_by_id = {"water": 0, "fire": 1, "steam": 70000, "mud": 5}
+
+    user_progress.update(progress_with_seqs(user_progress, seq_by_id))
+    assert user_progress["discovered_elements"] == [0, 1, 70000, 1, 5]
+    assert user_progress["list_offset"] == 3
+
+    fields = progress_as_bitmap(user_progress, recent_size=2)
+    assert bitmap.decode(fields["chunks"]) == [0, 1, 5, 70000]
+    assert bitmap.decode_log(fields["log"]) == [0, 1, 70000, 5]
+    assert fields["discovery_count"] == 4
+    assert fields["version"] == 8
+    assert fields["recent"] == [1, 5]
+
+
+def test_progress_with_missing_elements_moves_the_version_on():
+    user_progress = {"user_id": "u", "discovered_elements": ["water", "gone"]}
+    converted = progress_with_seqs(user_progress, {"water": 0})
+    assert converted == {"discovered_elements": [0], "list_offset": 3}
+    # Past the version any client could hold for the old list
+    assert converted["list_offset"] + len(converted["discovered_elements"]) > 2